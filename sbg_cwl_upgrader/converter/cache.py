@@ -0,0 +1,174 @@
+from copy import deepcopy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import sbg_cwl_upgrader
+from sbg_cwl_upgrader.cwl_utils import calc_json_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache',
+                                 'sbg_cwl_upgrader')
+DEFAULT_CACHE_SIZE = 512  # MB
+
+
+class ConversionMemo(object):
+    """
+    In-run memo of converted tools and subworkflows.
+    Converted apps are keyed on the content hash of their draft2 dict, so
+    every unique app is converted once and other steps get a copy.
+    """
+
+    def __init__(self):
+        self.converted = {}
+        # Apps converted ahead of time, counted where they were converted
+        self.prefetched = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Memo content stays in the process that owns it, workers start
+        # with an empty memo and report their counters back.
+        return {'converted': {}, 'prefetched': set(), 'hits': 0,
+                'misses': 0}
+
+    @staticmethod
+    def key(data: dict):
+        return calc_json_hash(data)
+
+    def __contains__(self, key):
+        return key in self.converted
+
+    def store(self, key, converted: dict, prefetched: bool = False):
+        """
+        Store an app converted elsewhere (e.g. in a worker process)
+        :param key: memo key of the draft2 app
+        :param converted: converted app dict
+        :param prefetched: app was converted ahead of time, and lookups
+        are not counted
+        """
+        self.converted[key] = deepcopy(converted)
+        if prefetched:
+            self.prefetched.add(key)
+
+    def convert(self, data: dict, convert, key=None):
+        """
+        Return converted app from memo or convert it and remember the result
+        :param data: draft2 app dict
+        :param convert: function converting draft2 app dict
+        :param key: memo key of data, if already known
+        :return: converted app dict
+        """
+        if key is None:
+            key = self.key(data)
+        if key in self.converted:
+            if key not in self.prefetched:
+                self.hits += 1
+            return deepcopy(self.converted[key])
+        self.misses += 1
+        converted = convert(data)
+        self.store(key, converted)
+        return converted
+
+    def add_counts(self, hits: int, misses: int):
+        self.hits += hits
+        self.misses += misses
+
+    def summary(self):
+        return 'Conversion memo: {} hits, {} misses.'.format(self.hits,
+                                                             self.misses)
+
+
+class ConversionDiskCache(object):
+    """
+    Persistent cache of converted apps shared between runs.
+    Entries are keyed on the draft2 content hash, target CWL version and
+    package version. Least recently used entries are evicted once the
+    cache grows over max_size bytes.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_size: int = DEFAULT_CACHE_SIZE * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(data: dict, cwl_version: str):
+        return hashlib.md5('{}-{}-{}'.format(
+            calc_json_hash(data), cwl_version, sbg_cwl_upgrader.__version__
+        ).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def get(self, key: str):
+        """
+        Load cached app and mark it as recently used
+        :param key: cache key
+        :return: converted app dict or None
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                converted = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return converted
+
+    def put(self, key: str, converted: dict):
+        """
+        Store converted app and evict old entries if needed
+        :param key: cache key
+        :param converted: converted app dict
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(converted, f)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning('Could not cache converted app: {}'.format(e))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries over the size limit"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
+
+    def convert(self, data: dict, cwl_version: str, convert):
+        """
+        Return converted app from cache or convert it and cache the result
+        :param data: draft2 app dict
+        :param cwl_version: target CWL version
+        :param convert: function converting draft2 app dict
+        :return: converted app dict
+        """
+        key = self.key(data, cwl_version)
+        converted = self.get(key)
+        if converted is None:
+            converted = convert(data)
+            self.put(key, converted)
+        return converted
@@ -10,13 +10,22 @@ from sbg_cwl_upgrader.validator.cwl_validation import CWLValidator
 from sbg_cwl_upgrader.decomposer.sbg_cwl_decomposer import (breakdown_wf_sbg,
                                                             breakdown_wf_local)
 from sbg_cwl_upgrader.cwl_utils import (yaml_ext, json_ext,
-                                        is_local, add_revision_note)
+                                        is_local, add_revision_note,
+                                        js_cache_counts,
+                                        beautify_expressions, is_tree)
 from sbg_cwl_upgrader.sbg_utils import init_api
 
 import os
 from termcolor import colored
 from sbg_cwl_upgrader.converter.workflow import CWLWorkflowConverter
 from sbg_cwl_upgrader.converter.tool import CWLToolConverter
+from sbg_cwl_upgrader.converter.cache import (ConversionMemo,
+                                              ConversionDiskCache,
+                                              DEFAULT_CACHE_SIZE)
+from sbg_cwl_upgrader.converter.executor import (set_jobs, set_backend,
+                                                 select_backend,
+                                                 shutdown_pool)
+from sbg_cwl_upgrader.converter.scheduler import conversion_cost
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +60,12 @@ class CWLConverterFacade:
                  endpoint: str = None,
                  validate: bool = False,
                  update: bool = False,
-                 decompose: bool = False):
+                 decompose: bool = False,
+                 cache_dir: str = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE,
+                 beautify: bool = True,
+                 jobs: int = None,
+                 executor: str = 'auto'):
         msg = 'Converting...'
         logger.info(msg)
         print(colored(msg, 'green'))
@@ -69,6 +83,11 @@ class CWLConverterFacade:
         self.validate = validate
         self.update = update
         self.decompose = decompose
+        self.memo = ConversionMemo()
+        # Persistent cache of converted apps, in MB
+        self.cache = ConversionDiskCache(
+            cache_dir, cache_size * 1024 * 1024
+        ) if cache_dir else None
 
         if not (is_local(input_) and is_local(output)):
             self.api = init_api(profile=profile, platform=platform,
@@ -78,8 +97,15 @@ class CWLConverterFacade:
         self.app_revision = int(app_revision) \
             if app_revision is not None else None
 
-        # Perform conversion
-        self.data = self._parse(self._load_input_cwl())
+        # Perform conversion, in a worker pool of given size
+        set_jobs(jobs)
+        set_backend(executor)
+        try:
+            data = self._load_input_cwl()
+            select_backend(conversion_cost(data))
+            self.data = self._parse(data)
+        finally:
+            shutdown_pool()
 
         # region remove batch
         # Remove batch information from cwl1 version
@@ -98,6 +124,10 @@ class CWLConverterFacade:
         remove_batch(self.data)
         # endregion
 
+        # Format JS expressions once, on the finished document
+        if beautify:
+            self.data = beautify_expressions(self.data)
+
         msg = ("Please check javascript expressions and globs "
                "in your wrapper. Errors are possible due to "
                "unsupported backward compatibility.")
@@ -111,6 +141,14 @@ class CWLConverterFacade:
         logger.info(msg)
         print(colored(msg, 'green'))
 
+        msg = self.memo.summary()
+        logger.info(msg)
+        print(colored(msg, 'green'))
+        msg = 'JS translation cache: {} hits, {} misses.'.format(
+            *js_cache_counts())
+        logger.info(msg)
+        print(colored(msg, 'green'))
+
         # Add contribution info
         if output and not is_local(output):
             slash_count = output.count('/')
@@ -238,14 +276,22 @@ class CWLConverterFacade:
         return raw
 
     def _parse(self, data):
+        # Loaded input is converted in place, unless it shares objects
+        # (e.g. YAML aliases) and needs a private copy
+        owned = is_tree(data)
         if 'class' in data and isinstance(data['class'], str):
             if data['class'] == 'CommandLineTool':
                 return CWLToolConverter(
-                    cwl_version=self.cwl_version
+                    cwl_version=self.cwl_version,
+                    cache=self.cache,
+                    owned=owned
                 ).convert_dict(data)
             elif data['class'] == 'Workflow':
                 return CWLWorkflowConverter(
-                    cwl_version=self.cwl_version
+                    cwl_version=self.cwl_version,
+                    memo=self.memo,
+                    cache=self.cache,
+                    owned=owned
                 ).convert_dict(data)
         else:
             raise ValueError('Invalid cwl class.')
@@ -0,0 +1,137 @@
+import atexit
+import threading
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+from billiard.pool import Pool
+
+BACKENDS = ['auto', 'serial', 'thread', 'process']
+# Estimated conversion cost (see scheduler.conversion_cost) over which
+# the auto backend converts in worker processes. Starting and stopping
+# the process pool takes about a second, more than converting cheaper
+# workflows serially.
+AUTO_PROCESS_COST = 10000
+
+# Process-wide worker pool, created on first use and shared by every
+# nesting level of workflow conversion.
+_pool = None
+_pool_backend = None
+_jobs = None
+_backend = 'auto'
+# Backend picked for the current conversion by the auto backend
+_selected = None
+# Set in pool workers, nested workflows in a worker are converted serially
+_worker = threading.local()
+
+
+def _init_worker():
+    _worker.active = True
+
+
+def _in_worker():
+    return getattr(_worker, 'active', False)
+
+
+def get_jobs():
+    """Number of workers used for conversion"""
+    return _jobs or cpu_count()
+
+
+def set_jobs(jobs: int = None):
+    """
+    Set number of workers, by default one per CPU.
+    Running pool of different size is shut down.
+    :param jobs: number of workers
+    """
+    global _jobs
+    if jobs is not None and jobs < 1:
+        raise ValueError('Number of jobs must be positive.')
+    if _pool is not None and (jobs or cpu_count()) != get_jobs():
+        shutdown_pool()
+    _jobs = jobs
+
+
+def get_backend():
+    """Name of the backend used for conversion"""
+    if _backend != 'auto':
+        return _backend
+    return _selected or 'process'
+
+
+def set_backend(backend: str = 'auto'):
+    """
+    Set conversion backend.
+    serial - convert in the calling thread
+    thread - convert in a pool of threads
+    process - convert in a pool of worker processes
+    auto - pick serial or process backend by workflow cost
+    :param backend: backend name
+    """
+    global _backend, _selected
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend {}, use one of: {}.'.format(
+            backend, ', '.join(BACKENDS)))
+    _backend = backend
+    _selected = None
+
+
+def select_backend(cost: int):
+    """
+    Pick backend for a workflow of given estimated conversion cost,
+    if the auto backend is used.
+    :param cost: estimated conversion cost
+    :return: name of the backend used
+    """
+    global _selected
+    _selected = 'process' if cost > AUTO_PROCESS_COST else 'serial'
+    return get_backend()
+
+
+def isolated():
+    """Check if tasks run on copies of their arguments"""
+    return get_backend() == 'process'
+
+
+def get_pool():
+    """
+    Return shared worker pool, creating it if needed.
+    :return: pool, or None if conversion should run serially
+    """
+    global _pool, _pool_backend
+    backend = get_backend()
+    if _in_worker() or get_jobs() == 1 or backend == 'serial':
+        return None
+    if _pool is not None and _pool_backend != backend:
+        shutdown_pool()
+    if _pool is None:
+        if backend == 'thread':
+            _pool = ThreadPool(get_jobs(), initializer=_init_worker)
+        else:
+            _pool = Pool(get_jobs(), initializer=_init_worker)
+        _pool_backend = backend
+    return _pool
+
+
+def shutdown_pool():
+    """Stop shared worker pool, a new one is created on next use"""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        # Results are consumed by the time the pool is shut down, and
+        # terminating idle workers is much faster than close() in billiard
+        pool.terminate()
+        pool.join()
+
+
+def imap_unordered(func, iterable):
+    """
+    Map func over iterable in the shared pool, or serially inside
+    pool workers and when running with a single job.
+    """
+    pool = get_pool()
+    if pool is None:
+        return map(func, iterable)
+    return pool.imap_unordered(func, iterable)
+
+
+atexit.register(shutdown_pool)
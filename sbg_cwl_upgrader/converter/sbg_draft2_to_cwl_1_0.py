@@ -5,6 +5,9 @@ from sbg_cwl_upgrader.sbg_utils import (add_sbg_auth_to_args,
                                         add_logging_to_args)
 from sbg_cwl_upgrader.converter.cwl_converter import CWLConverterFacade
 from sbg_cwl_upgrader.cwl_utils import DEFAULT_CWL_VERSION
+from sbg_cwl_upgrader.converter.cache import (DEFAULT_CACHE_DIR,
+                                              DEFAULT_CACHE_SIZE)
+from sbg_cwl_upgrader.converter.executor import BACKENDS
 
 
 def create_arg_parser():
@@ -29,6 +32,23 @@ def create_arg_parser():
                         help='update/install if output is a platform app.')
     parser.add_argument('-d', '--decompose', action='store_true',
                         help='decompose the converted CWL v1 workflow.')
+    parser.add_argument('--no-beautify', dest='beautify',
+                        action='store_false',
+                        help='emit JS expressions without formatting.')
+    parser.add_argument('--cache', action='store_true',
+                        help='reuse apps converted in previous runs.')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='directory of the conversion cache.')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help='conversion cache size limit in MB.')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='number of conversion workers.'
+                             ' default: number of CPUs')
+    parser.add_argument('-e', '--executor', default='auto',
+                        choices=BACKENDS,
+                        help='run conversion serially, in a pool of threads'
+                             ' or processes. default: auto, processes for'
+                             ' large workflows')
 
     add_logging_to_args(parser)
     add_sbg_auth_to_args(parser)
@@ -55,7 +75,12 @@ def main(args=sys.argv[1:]):
                        cwl_version=args['cwl_version'],
                        validate=args['validate'],
                        update=args['update'],
-                       decompose=args['decompose'])
+                       decompose=args['decompose'],
+                       cache_dir=args['cache_dir'] if args['cache'] else None,
+                       cache_size=args['cache_size'],
+                       beautify=args['beautify'],
+                       jobs=args['jobs'],
+                       executor=args['executor'])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,178 @@
+import os
+from queue import Queue
+
+import tqdm
+from sbg_cwl_upgrader.cwl_utils import js_cache_counts, add_js_cache_counts
+from sbg_cwl_upgrader.converter.cache import ConversionMemo
+from sbg_cwl_upgrader.converter.tool import CWLToolConverter
+from sbg_cwl_upgrader.converter.executor import isolated
+
+
+def conversion_cost(data):
+    """
+    Estimate conversion cost of a draft2 app, including nested apps.
+    Cost is the number of app inputs and outputs and JS expressions.
+    :param data: draft2 app dict
+    :return: estimated cost
+    """
+    cost = 0
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node.get('class') == 'Expression':
+                cost += 1
+            elif node.get('class') in ['CommandLineTool', 'Workflow']:
+                cost += (len(node.get('inputs', []))
+                         + len(node.get('outputs', [])))
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return cost
+
+
+def _convert_tool_task(data: dict, cwl_version: str, cache, owned: bool):
+    """Convert a tool in a worker and report JS cache counters"""
+    js_hits, js_misses = js_cache_counts(local_only=True)
+    converted = CWLToolConverter(
+        cwl_version=cwl_version, cache=cache, owned=owned
+    ).convert_dict(data)
+    new_js_hits, new_js_misses = js_cache_counts(local_only=True)
+    return (converted, os.getpid(),
+            new_js_hits - js_hits, new_js_misses - js_misses)
+
+
+def _convert_workflow_task(data: dict, children: dict, cwl_version: str,
+                           cache, owned: bool):
+    """Assemble a workflow in a worker from its converted steps"""
+    # Imported here, workflow module imports the scheduler
+    from sbg_cwl_upgrader.converter.workflow import CWLWorkflowConverter
+    memo = ConversionMemo()
+    for key, converted in children.items():
+        memo.store(key, converted, prefetched=True)
+    converted = CWLWorkflowConverter(
+        cwl_version=cwl_version, memo=memo, cache=cache, owned=owned
+    ).convert_dict(data)
+    return converted, os.getpid(), 0, 0
+
+
+class ConversionScheduler(object):
+    """
+    Converts all apps nested in a draft2 workflow in one pool, bottom-up.
+    The workflow tree is flattened into unique apps, tools are converted
+    first and each subworkflow once all of its steps are converted.
+    Converted apps are stored in the memo, so the workflow itself is
+    then assembled from memo hits, the same way as without the scheduler.
+    """
+
+    def __init__(self, cwl_version: str, memo: ConversionMemo, cache=None):
+        self.cwl_version = cwl_version
+        self.memo = memo
+        self.cache = cache
+        # key -> (draft2 app, keys of apps run by its steps)
+        self.apps = {}
+        # key -> estimated conversion cost
+        self.costs = {}
+
+    def _collect(self, data: dict, nested: bool = False):
+        """
+        Collect unique apps run by workflow steps, children first.
+        Memo lookups of collected apps are counted here, the same way
+        as converting the workflow tree step by step would count them.
+        :param data: draft2 workflow dict
+        :param nested: data is a subworkflow
+        :return: memo keys of apps run by the workflow steps
+        """
+        keys = []
+        for step in data.get('steps', []):
+            run = step.get('run')
+            if not isinstance(run, dict) or run.get('class') not in [
+                    'CommandLineTool', 'Workflow']:
+                continue
+            key = self.memo.key(run)
+            keys.append(key)
+            if key in self.apps:
+                self.memo.add_counts(1, 0)
+                continue
+            if key in self.memo:
+                # Top level lookups are counted when steps are converted
+                if nested or key in self.memo.prefetched:
+                    self.memo.add_counts(1, 0)
+                continue
+            self.memo.add_counts(0, 1)
+            if self.cache is not None and self._load_cached(key, run):
+                continue
+            children = (self._collect(run, nested=True)
+                        if run['class'] == 'Workflow' else [])
+            self.apps[key] = (run, children)
+            self.costs[key] = conversion_cost(run)
+        return keys
+
+    def _load_cached(self, key: str, data: dict):
+        """Store app converted in a previous run in the memo"""
+        if data.get('cwlVersion') != 'sbg:draft-2':
+            return False
+        converted = self.cache.get(self.cache.key(data, self.cwl_version))
+        if converted is None:
+            return False
+        self.memo.store(key, converted, prefetched=True)
+        return True
+
+    def _submit(self, pool, key: str, results: Queue):
+        data, children = self.apps[key]
+
+        def callback(result):
+            results.put((key, result, None))
+
+        def error_callback(e):
+            results.put((key, None, e))
+
+        if data['class'] == 'CommandLineTool':
+            pool.apply_async(_convert_tool_task,
+                             (data, self.cwl_version, self.cache,
+                              isolated()),
+                             callback=callback,
+                             error_callback=error_callback)
+        else:
+            converted_children = {k: self.memo.converted[k]
+                                  for k in set(children)}
+            pool.apply_async(_convert_workflow_task,
+                             (data, converted_children, self.cwl_version,
+                              self.cache, isolated()),
+                             callback=callback,
+                             error_callback=error_callback)
+
+    def run(self, data: dict, pool):
+        """
+        Convert all apps nested in the workflow and store them in the memo
+        :param data: draft2 workflow dict
+        :param pool: worker pool
+        """
+        self._collect(data)
+        if not self.apps:
+            return
+        results = Queue()
+        waiting = dict(self.apps)
+        running = 0
+        with tqdm.tqdm(total=len(self.apps), leave=True,
+                       desc='Workflow apps') as progress:
+            while waiting or running:
+                ready = [key for key, (_, children) in waiting.items()
+                         if all(child in self.memo for child in children)]
+                # Longest job first, so a large app is not left for last
+                for key in sorted(ready, key=lambda k: -self.costs[k]):
+                    del waiting[key]
+                    self._submit(pool, key, results)
+                    running += 1
+                if not running:
+                    raise ValueError('Workflow steps have circular '
+                                     'dependencies.')
+                key, result, error = results.get()
+                running -= 1
+                if error is not None:
+                    raise error
+                converted, pid, js_hits, js_misses = result
+                if pid != os.getpid():
+                    add_js_cache_counts(js_hits, js_misses)
+                self.memo.store(key, converted, prefetched=True)
+                progress.update()
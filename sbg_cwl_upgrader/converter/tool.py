@@ -23,9 +23,10 @@ class Expression(CWL):
 
 
 class CommandLineBinding(CWL):
-    def __init__(self, sbg_draft2=None):
+    def __init__(self, sbg_draft2=None, owned=False):
+        self.owned = owned
         if sbg_draft2:
-            self.cwl = {x: y for x, y in deepcopy(sbg_draft2).items()
+            self.cwl = {x: y for x, y in self.own(sbg_draft2).items()
                         if y is not None}
             self.cwl['shellQuote'] = False
             if ('valueFrom' in sbg_draft2
@@ -41,9 +42,10 @@ class CommandLineBinding(CWL):
 
 
 class Input(CWL):
-    def __init__(self, sbg_draft2=None, in_id=''):
+    def __init__(self, sbg_draft2=None, in_id='', owned=False):
+        self.owned = owned
         if sbg_draft2:
-            self.cwl = deepcopy(sbg_draft2)
+            self.cwl = self.own(sbg_draft2)
             if 'description' in self.cwl:
                 self.cwl['doc'] = self.cwl['description']
                 del self.cwl['description']
@@ -64,7 +66,8 @@ class Input(CWL):
 
             if 'inputBinding' in self.cwl:
                 self.cwl['inputBinding'] = CommandLineBinding(
-                        sbg_draft2=self.cwl['inputBinding']).to_dict()
+                        sbg_draft2=self.cwl['inputBinding'],
+                        owned=True).to_dict()
 
                 if self.is_array_input(sbg_draft2):
                     # itemSeparator must go with prefix
@@ -146,10 +149,10 @@ class Input(CWL):
 
 
 class OutputBinding(CWL):
-    def __init__(self, sbg_draft2=None):
-
+    def __init__(self, sbg_draft2=None, owned=False):
+        self.owned = owned
         if sbg_draft2:
-            self.cwl = deepcopy(sbg_draft2)
+            self.cwl = self.own(sbg_draft2)
             if ('glob' in sbg_draft2
                     and isinstance(sbg_draft2['glob'], dict)
                     and 'script' in sbg_draft2['glob']):
@@ -199,9 +202,10 @@ class OutputBinding(CWL):
 
 
 class Output(CWL):
-    def __init__(self, sbg_draft2=None):
+    def __init__(self, sbg_draft2=None, owned=False):
+        self.owned = owned
         if sbg_draft2:
-            self.cwl = deepcopy(sbg_draft2)
+            self.cwl = self.own(sbg_draft2)
             if 'description' in self.cwl:
                 self.cwl['doc'] = self.cwl['description']
                 del self.cwl['description']
@@ -211,7 +215,8 @@ class Output(CWL):
                     self.cwl['secondaryFiles'] = \
                         self.cwl['outputBinding']['secondaryFiles']
                 self.cwl['outputBinding'] = OutputBinding(
-                    sbg_draft2=self.cwl['outputBinding']).to_dict()
+                    sbg_draft2=self.cwl['outputBinding'],
+                    owned=True).to_dict()
 
             if 'required' in self.cwl:
                 del self.cwl['required']
@@ -222,8 +227,11 @@ class Output(CWL):
 
 class CWLToolConverter(CWL):
 
-    def __init__(self, cwl_version=DEFAULT_CWL_VERSION):
+    def __init__(self, cwl_version=DEFAULT_CWL_VERSION, cache=None,
+                 owned=False):
         self.cwl_version = cwl_version
+        self.cache = cache
+        self.owned = owned
 
     @staticmethod
     def _is_staged_file(sbg_draft2_input):
@@ -231,10 +239,8 @@ class CWLToolConverter(CWL):
                 and sbg_draft2_input['sbg:stageInput']
                 and 'type' in sbg_draft2_input
                 and isinstance(sbg_draft2_input['type'], list)):
-            input_copy = deepcopy(sbg_draft2_input)
-            if 'null' in input_copy['type']:
-                input_copy['type'].remove('null')
-            draft2_type = input_copy['type'][0]
+            draft2_type = [t for t in sbg_draft2_input['type']
+                           if t != 'null'][0]
             if isinstance(draft2_type, str) and draft2_type == 'File':
                 return True
         return False
@@ -245,10 +251,8 @@ class CWLToolConverter(CWL):
                 and sbg_draft2_input['sbg:stageInput']
                 and 'type' in sbg_draft2_input
                 and isinstance(sbg_draft2_input['type'], list)):
-            input_copy = deepcopy(sbg_draft2_input)
-            if 'null' in input_copy['type']:
-                input_copy['type'].remove('null')
-            draft2_type = input_copy['type'][0]
+            draft2_type = [t for t in sbg_draft2_input['type']
+                           if t != 'null'][0]
             if (isinstance(draft2_type, dict)
                     and 'type' in draft2_type
                     and draft2_type['type'] == 'array'
@@ -273,16 +277,16 @@ class CWLToolConverter(CWL):
     def _handle_inputs(inputs: list,
                        base_command: list,
                        offset=None,
-                       min_inp_pos=0):
+                       min_inp_pos=0,
+                       owned=False):
         new_inputs = {}
         for inp_i in inputs:
             in_id = inp_i['id'].lstrip('#')
-            new_inputs[in_id] = deepcopy(inp_i)
-            del new_inputs[in_id]['id']
-            if 'sbg:stageInput' in new_inputs[in_id]:
-                del new_inputs[in_id]['sbg:stageInput']
+            new_inputs[in_id] = {k: v for k, v in inp_i.items()
+                                 if k not in ['id', 'sbg:stageInput']}
             new_inputs[in_id] = Input(sbg_draft2=new_inputs[in_id],
-                                      in_id=in_id).to_dict()
+                                      in_id=in_id,
+                                      owned=owned).to_dict()
             if isinstance(offset, int) and 'inputBinding' in new_inputs[in_id]:
                 if 'position' in new_inputs[in_id]['inputBinding']:
                     new_inputs[in_id]['inputBinding']['position'] = int(
@@ -294,13 +298,14 @@ class CWLToolConverter(CWL):
         return new_inputs
 
     @staticmethod
-    def _handle_outputs(outputs):
+    def _handle_outputs(outputs, owned=False):
         new_outputs = {}
         for output in outputs:
             o_id = output['id'].lstrip('#')
-            new_outputs[o_id] = deepcopy(output)
-            del new_outputs[o_id]['id']
-            new_outputs[o_id] = Output(sbg_draft2=new_outputs[o_id]).to_dict()
+            new_outputs[o_id] = {k: v for k, v in output.items()
+                                 if k != 'id'}
+            new_outputs[o_id] = Output(sbg_draft2=new_outputs[o_id],
+                                       owned=owned).to_dict()
         return new_outputs
 
     @staticmethod
@@ -330,7 +335,7 @@ class CWLToolConverter(CWL):
                 if hint['class'] == 'DockerRequirement':
                     if 'dockerImageId' in hint:
                         del hint['dockerImageId']
-                    new_requirements.append(deepcopy(hint))
+                    new_requirements.append(hint)
                 # ResourceRequirement
                 elif ((hint['class'] == 'sbg:CPURequirement')
                         or (hint['class'] == 'sbg:MemRequirement')):
@@ -390,7 +395,7 @@ class CWLToolConverter(CWL):
                         })
                 # EnvVarRequirement
                 elif requirement['class'] == 'EnvVarRequirement':
-                    new_requirements.append(deepcopy(requirement))
+                    new_requirements.append(requirement)
         initial_work_dir_requirement[
             'listing'] += CWLToolConverter._stage_inputs(inputs)
 
@@ -474,7 +479,7 @@ class CWLToolConverter(CWL):
             if ('valueFrom' in inp.get('inputBinding', {})
                     and not self.is_required_type(inp['type'])
                     and "loadContents" not in inp.get('inputBinding', {})):
-                new_arg = deepcopy(inp['inputBinding'])
+                new_arg = inp['inputBinding']
                 if isinstance(new_arg['valueFrom'], str):
                     new_arg['valueFrom'] = new_arg['valueFrom'].replace(
                         "self", "inputs.{}".format(in_id)
@@ -528,7 +533,15 @@ class CWLToolConverter(CWL):
         if data.get('cwlVersion') != 'sbg:draft-2':
             return data
 
-        new_data = {k: deepcopy(v)
+        if self.cache is not None:
+            return self.cache.convert(data, self.cwl_version,
+                                      self._convert_dict)
+        return self._convert_dict(data)
+
+    def _convert_dict(self, data: dict):
+        # Copy the input once, and convert the copy in place
+        data = self.own(data)
+        new_data = {k: v
                     for k, v in data.items()
                     if k not in ['baseCommand', 'description', 'cwlVersion',
                                  'inputs', 'outputs', 'requirements',
@@ -581,7 +594,8 @@ class CWLToolConverter(CWL):
                 data['inputs'] if 'inputs' in data else [],
                 data['baseCommand'] if 'baseCommand' in data else [],
                 offset=offset,
-                min_inp_pos=min_inp_pos)
+                min_inp_pos=min_inp_pos,
+                owned=True)
 
         new_data = self._handle_valuefrom_optional_inputs(new_data)
 
@@ -589,6 +603,6 @@ class CWLToolConverter(CWL):
             data['inputs'], data['outputs'])
         if 'outputs' in data:
             new_data['outputs'] = self._handle_outputs(
-                data['outputs'] if 'outputs' in data else [])
+                data['outputs'] if 'outputs' in data else [], owned=True)
 
         return new_data
@@ -1,22 +1,29 @@
-from copy import deepcopy
-from multiprocessing import cpu_count
+from copy import copy
+import os
 
 import tqdm
-from billiard.pool import Pool
 from sbg_cwl_upgrader.cwl_utils import CWL, DEFAULT_CWL_VERSION
-from sbg_cwl_upgrader.cwl_utils import as_list
+from sbg_cwl_upgrader.cwl_utils import (as_list, copy_tree, js_cache_counts,
+                                        add_js_cache_counts)
 from sbg_cwl_upgrader.converter.tool import CWLToolConverter
 from sbg_cwl_upgrader.converter.connection_checker import ConnectionChecker
+from sbg_cwl_upgrader.converter.cache import ConversionMemo
+from sbg_cwl_upgrader.converter.executor import get_pool, imap_unordered
+from sbg_cwl_upgrader.converter.scheduler import (ConversionScheduler,
+                                                  conversion_cost)
 
 
 class CWLWorkflowConverter(CWL):
 
-    def __init__(self, cwl_version=DEFAULT_CWL_VERSION):
+    def __init__(self, cwl_version=DEFAULT_CWL_VERSION, memo=None,
+                 cache=None, owned=False):
         self.cwl_version = cwl_version
+        self.memo = memo if memo is not None else ConversionMemo()
+        self.cache = cache
+        self.owned = owned
 
     @staticmethod
     def handle_source(source: list):
-        source = deepcopy(source)
         out = []
         for s in as_list(source):
             s = s.lstrip('#').replace('.', '/')
@@ -24,7 +31,7 @@ class CWLWorkflowConverter(CWL):
         return out
 
     def handle_input(self, draft2_input):
-        v1_input = deepcopy(draft2_input)
+        v1_input = self.own(draft2_input)
 
         if 'id' in v1_input:
             v1_input['id'] = self.handle_id(v1_input['id'])
@@ -34,7 +41,7 @@ class CWLWorkflowConverter(CWL):
         if 'required' in v1_input:
             del v1_input['required']
         if 'description' in v1_input:
-            v1_input['doc'] = deepcopy(v1_input['description'])
+            v1_input['doc'] = v1_input['description']
             del v1_input['description']
         if 'type' in v1_input:
             v1_input['type'] = self.shorten_type(v1_input['type'])
@@ -50,13 +57,12 @@ class CWLWorkflowConverter(CWL):
 
     def handle_inputs(self, inputs):
         result = []
-        inputs = deepcopy(inputs)
         for inp in inputs:
             result.append(self.handle_input(inp))
         return result
 
     def handle_output(self, output):
-        output = deepcopy(output)
+        output = self.own(output)
         if 'id' in output:
             output['id'] = self.handle_id(output['id'])
         # if 'sbg:fileTypes' in output:
@@ -65,7 +71,7 @@ class CWLWorkflowConverter(CWL):
         if 'required' in output:
             del output['required']
         if 'description' in output:
-            output['doc'] = deepcopy(output['description'])
+            output['doc'] = output['description']
             del output['description']
         if 'type' in output:
             output['type'] = self.shorten_type(output['type'])
@@ -75,13 +81,12 @@ class CWLWorkflowConverter(CWL):
 
     def handle_outputs(self, outputs):
         result = []
-        outputs = deepcopy(outputs)
         for o in outputs:
             result.append(self.handle_output(o))
         return result
 
-    def handle_step(self, step):
-        step = deepcopy(step)
+    def handle_step(self, step, key=None):
+        step = self.own(step)
 
         if 'id' in step:
             step['id'] = self.handle_id(step['id'])
@@ -92,11 +97,24 @@ class CWLWorkflowConverter(CWL):
             step['out'] = self.handle_outputs(step['outputs'])
             del step['outputs']
         if 'run' in step:
-            step['run'] = self.parse_step(step['run'], step.get('id', 'No ID'))
+            step['run'] = self.parse_step(step['run'], step.get('id', 'No ID'),
+                                          key=key)
         if 'scatter' in step:
             step['scatter'] = self.handle_id(step['scatter'])
         return step
 
+    def _handle_step_task(self, step):
+        """
+        Convert a step in a worker and report memo counters of the worker.
+        """
+        hits, misses = self.memo.hits, self.memo.misses
+        js_hits, js_misses = js_cache_counts(local_only=True)
+        step = self.handle_step(step)
+        new_js_hits, new_js_misses = js_cache_counts(local_only=True)
+        return (step, os.getpid(),
+                self.memo.hits - hits, self.memo.misses - misses,
+                new_js_hits - js_hits, new_js_misses - js_misses)
+
     def handle_steps(self, steps):
         def map_out(x):
             if step_index in x:
@@ -104,27 +122,64 @@ class CWLWorkflowConverter(CWL):
             return x
 
         step_index = 'step_index'
-        steps = deepcopy(steps)
+        steps = self.own(steps)
         for i, s in enumerate(steps):
             s[step_index] = i
 
+        # Send only the first step running each unique app to the pool,
+        # steps running the same app are served from the memo afterwards.
+        keys = [self.memo.key(s['run']) if 'run' in s else None
+                for s in steps]
+        unique = {}
+        duplicates = []
+        for key, s in zip(keys, steps):
+            if key is not None and (key in unique or key in self.memo):
+                duplicates.append((s, key))
+            else:
+                unique[key if key is not None else id(s)] = s
+
+        # Longest job first, so a large app is not left for last
+        tasks = sorted(unique.values(),
+                       key=lambda s: -conversion_cost(s.get('run', {})))
+        done = []
+        for step, pid, hits, misses, js_hits, js_misses in tqdm.tqdm(
+                imap_unordered(self._handle_step_task, tasks),
+                total=len(unique),
+                leave=True,
+                desc='Workflow steps'):
+            # Steps converted in this process are already counted
+            if pid != os.getpid():
+                self.memo.add_counts(hits, misses)
+                add_js_cache_counts(js_hits, js_misses)
+            if keys[step[step_index]] is not None:
+                self.memo.store(keys[step[step_index]], step['run'])
+            done.append(step)
+        # Keys are computed up front, steps sharing a run object
+        # (e.g. YAML aliases) may see it converted in place by now
+        done.extend(self.handle_step(s, key) for s, key in duplicates)
+
         out = [x for x in
-               map(map_out,
-                   sorted([done for done in
-                           tqdm.tqdm(get_pool().imap_unordered(
-                               self.handle_step, steps),
-                               total=len(steps),
-                               leave=True,
-                               desc='Workflow steps')],
-                          key=lambda x: x[step_index]))]
+               map(map_out, sorted(done, key=lambda x: x[step_index]))]
         return out
 
-    def parse_step(self, data: dict, step_id: str):
+    def _convert_tool(self, data: dict):
+        return CWLToolConverter(
+            cwl_version=self.cwl_version, cache=self.cache, owned=self.owned
+        ).convert_dict(data)
+
+    def _convert_workflow(self, data: dict):
+        return CWLWorkflowConverter(
+            cwl_version=self.cwl_version, memo=self.memo, cache=self.cache,
+            owned=self.owned
+        ).convert_dict(data)
+
+    def parse_step(self, data: dict, step_id: str, key=None):
         if 'class' in data and isinstance(data['class'], str):
             if data['class'] == 'CommandLineTool':
-                return CWLToolConverter(cwl_version=self.cwl_version).convert_dict(data)
+                return self.memo.convert(data, self._convert_tool, key=key)
             elif data['class'] == 'Workflow':
-                return CWLWorkflowConverter(cwl_version=self.cwl_version).convert_dict(data)
+                return self.memo.convert(data, self._convert_workflow,
+                                         key=key)
             else:
                 raise ValueError(
                     'Invalid cwl class in step {}.'.format(step_id)
@@ -141,7 +196,27 @@ class CWLWorkflowConverter(CWL):
                 {'class': 'StepInputExpressionRequirement'}]
 
     def convert_dict(self, data: dict) -> dict:
-        v1_data = {k: deepcopy(v) for k, v in data.items()
+        if (self.cache is not None
+                and data.get('cwlVersion') == 'sbg:draft-2'):
+            return self.cache.convert(data, self.cwl_version,
+                                      self._convert_dict)
+        return self._convert_dict(data)
+
+    def _convert_dict(self, data: dict) -> dict:
+        if not self.owned:
+            # Copy the whole document once, nested steps and apps
+            # are then converted in place
+            owner = copy(self)
+            owner.owned = True
+            return owner._convert_dict(copy_tree(data))
+        pool = get_pool()
+        if pool is not None and data.get('cwlVersion') == 'sbg:draft-2':
+            # Convert all nested apps bottom-up in the pool first,
+            # steps are then served from the memo
+            ConversionScheduler(
+                self.cwl_version, self.memo, self.cache
+            ).run(data, pool)
+        v1_data = {k: v for k, v in data.items()
                      if k not in ['x', 'y', 'appUrl']}
         if v1_data.get('cwlVersion') != 'sbg:draft-2':
 
@@ -152,7 +227,7 @@ class CWLWorkflowConverter(CWL):
         v1_data['outputs'] = self.handle_outputs(v1_data['outputs'])
         v1_data['requirements'] = self.default_requirements()
         if 'description' in v1_data:
-            v1_data['doc'] = deepcopy(v1_data['description'])
+            v1_data['doc'] = v1_data['description']
             del v1_data['description']
         for o in v1_data['outputs']:
             o['id'] = self.handle_id(o['id'])
@@ -164,9 +239,3 @@ class CWLWorkflowConverter(CWL):
         v1_data = connection_checker.fix_terminal_output_types(v1_data)
         v1_data = connection_checker.fix_connection_matching(v1_data)
         return v1_data
-
-
-def get_pool(pool=None):
-    if not pool:
-        pool = Pool(cpu_count())
-    return pool
@@ -1,14 +1,17 @@
-from copy import deepcopy
+from copy import copy, deepcopy
+from functools import lru_cache
 import jsbeautifier
 from collections.abc import Mapping, Sequence
 from termcolor import colored
+from sbg_cwl_upgrader.js_utils import translate_draft2_js, has_return
 import ruamel.yaml
 import os
-import re
 import hashlib
 import json
 
 DEFAULT_CWL_VERSION = 'v1.0'
+# Number of JS snippets kept by each JS translation memo
+JS_CACHE_SIZE = 4096
 
 
 class CWL(object):
@@ -16,10 +19,20 @@ class CWL(object):
     Base class for CWL conversion, containing CWL methods used in conversion.
     """
     cwl = {}
+    # Conversion owns its input, so it is converted in place, without copying
+    owned = False
 
     def to_dict(self):
         return self.cwl
 
+    def own(self, data):
+        """
+        Return data if conversion owns it, otherwise a private copy of it.
+        Input is copied once, where it enters conversion, and it is shared
+        and updated in place afterwards.
+        """
+        return data if self.owned else copy_tree(data)
+
     @staticmethod
     def shorten_type(type_obj):
         """
@@ -47,7 +60,7 @@ class CWL(object):
         if isinstance(type_obj, list):
             if len(type_obj) == 2:
                 if 'null' in type_obj:
-                    type_copy = deepcopy(type_obj)
+                    type_copy = list(type_obj)
                     type_copy.remove('null')
                     if isinstance(type_copy[0], str):
                         return type_copy[0] + '?'
@@ -62,7 +75,7 @@ class CWL(object):
         - Missing return statement in expressions.
         :param script: Javascript expression
         """
-        if script.find('return') == -1:
+        if not has_return(script):
             print(
                 colored('\nNo return statement in script:\n{}'.format(script),
                         'red')
@@ -70,37 +83,7 @@ class CWL(object):
 
     def parse_js(self, script: str):
         """Convert draft2 JS objects to V1 JS objects"""
-        lines = script.splitlines()
-
-        # Wrap expression in ${}
-        if script.strip().startswith("{") and script.strip().endswith("}"):
-            new_script = '$' + '\n'.join(lines)
-        elif len(lines) == 1 and 'return' not in lines[0]:
-            # one-liners without return
-            new_script = '${ return ' + lines[0] + '}'
-        else:
-            new_script = '${' + '\n'.join(lines) + '}'
-
-        # Map draft2 objects and properties to v1 objects and properties
-        new_script = new_script.replace('$job.inputs', 'inputs')
-        new_script = new_script.replace(
-            '$job.allocatedResources.mem', 'runtime.ram')
-        new_script = new_script.replace(
-            '$job.allocatedResources.cpu', 'runtime.cores')
-        new_script = new_script.replace('$job.allocatedResources', 'runtime')
-        new_script = new_script.replace('$self', 'self')
-        # Sometimes people used ".name" in draft2
-        new_script = new_script.replace('.name', '.basename')
-        new_script = new_script.replace("['name']", "['basename']")
-        new_script = jsbeautifier.beautify(new_script)
-        new_script = new_script.replace('$ {', '${')
-        # Solve different handling of null values
-        new_script = re.sub(r'typeof (?P<var>.*) !== "undefined"',
-                            r'\g<var>',
-                            new_script)
-        new_script = re.sub(r"typeof (?P<var>.*) !== 'undefined'",
-                            r'\g<var>',
-                            new_script)
+        new_script = translate_js(script)
 
         # Print out warnings about common issues
         self._print_js_warnings(new_script)
@@ -161,20 +144,17 @@ class CWL(object):
 
     @staticmethod
     def wrap_expression(code: str):
-        return jsbeautifier.beautify('${\n' + code + '\n}').replace('$ {',
-                                                                    '${')
+        return '${\n' + code + '\n}'
 
     @staticmethod
     def append_js(code: str, add: str):
         new_code = code.strip().rstrip('}')
-        new_code = new_code + '\n' + add + '\n}'
-        return jsbeautifier.beautify(new_code).replace('$ {', '${')
+        return new_code + '\n' + add + '\n}'
 
     @staticmethod
     def prepend_js(code: str, add: str):
         new_code = code.strip().lstrip('${')
-        new_code = '${\n' + add + '\n' + new_code
-        return jsbeautifier.beautify(new_code).replace('$ {', '${')
+        return '${\n' + add + '\n' + new_code
 
     @staticmethod
     def is_file_input(sbg_draft2_input: dict):
@@ -225,11 +205,143 @@ class CWL(object):
     @staticmethod
     def handle_id(m_id: str):
         """In CWL1 input/output ID shouldn't start with #"""
-        m_id = deepcopy(m_id).lstrip('#')
+        m_id = m_id.lstrip('#')
         m_id = m_id.rsplit('.')[1] if m_id.count('.') > 0 else m_id
         return m_id
 
 
+@lru_cache(maxsize=JS_CACHE_SIZE)
+def translate_js(script: str):
+    """
+    Map draft2 JS objects and properties in a script to v1 ones
+    :param script: draft2 JS expression
+    :return: v1 JS expression
+    """
+    lines = script.splitlines()
+
+    # Wrap expression in ${}
+    if script.strip().startswith("{") and script.strip().endswith("}"):
+        new_script = '$' + '\n'.join(lines)
+    elif len(lines) == 1 and 'return' not in lines[0]:
+        # one-liners without return
+        new_script = '${ return ' + lines[0] + '}'
+    else:
+        new_script = '${' + '\n'.join(lines) + '}'
+
+    # Map draft2 objects and properties to v1 objects and properties
+    return translate_draft2_js(new_script)
+
+
+def is_expression(value):
+    """Check if value is a CWL expression (${...})"""
+    return (isinstance(value, str) and value.lstrip().startswith('${')
+            and value.rstrip().endswith('}'))
+
+
+@lru_cache(maxsize=JS_CACHE_SIZE)
+def beautify_js(code: str):
+    """
+    Format a CWL expression
+    :param code: CWL expression (${...})
+    :return: formatted CWL expression
+    """
+    return jsbeautifier.beautify(code).replace('$ {', '${')
+
+
+def beautify_expressions(cwl):
+    """
+    Format all CWL expressions in a document, once per unique expression.
+    :param cwl: CWL dict, list or value
+    :return: CWL with formatted expressions, dicts and lists are updated
+    in place
+    """
+    if isinstance(cwl, dict):
+        for k, v in cwl.items():
+            cwl[k] = beautify_expressions(v)
+    elif isinstance(cwl, list):
+        for i, v in enumerate(cwl):
+            cwl[i] = beautify_expressions(v)
+    elif is_expression(cwl):
+        return beautify_js(cwl)
+    return cwl
+
+
+# Added to local counters by JS translations done in worker processes
+_worker_js_cache_counts = [0, 0]
+
+
+def js_caches():
+    return {
+        'parse_js': translate_js,
+        'beautify_js': beautify_js
+    }
+
+
+def js_cache_info():
+    """
+    Hit and miss counters of JS translation memos in this process
+    :return: dict with functools CacheInfo for every memoized function
+    """
+    return {name: f.cache_info() for name, f in js_caches().items()}
+
+
+def js_cache_counts(local_only: bool = False):
+    """
+    Total JS translation memo hits and misses
+    :param local_only: skip counts reported by worker processes
+    :return: (hits, misses)
+    """
+    info = js_cache_info().values()
+    hits = sum(i.hits for i in info)
+    misses = sum(i.misses for i in info)
+    if not local_only:
+        hits += _worker_js_cache_counts[0]
+        misses += _worker_js_cache_counts[1]
+    return hits, misses
+
+
+def add_js_cache_counts(hits: int, misses: int):
+    """Add JS translation memo counters reported by a worker process"""
+    _worker_js_cache_counts[0] += hits
+    _worker_js_cache_counts[1] += misses
+
+
+class _UnsharedMemo(dict):
+    """deepcopy memo which never remembers copied objects"""
+
+    def __setitem__(self, key, value):
+        pass
+
+
+def copy_tree(data):
+    """
+    Deep copy of a dict/list tree. Unlike deepcopy, objects shared in data
+    (e.g. through YAML aliases) are copied separately, so the copy can be
+    updated in place.
+    :param data: dict/list tree without cycles
+    :return: copy of data
+    """
+    return deepcopy(data, _UnsharedMemo())
+
+
+def is_tree(data):
+    """
+    Check that no dict or list is shared in a dict/list tree
+    :param data: dict/list tree
+    :return: True if every dict and list appears once
+    """
+    seen = set()
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (dict, list)):
+            if id(node) in seen:
+                return False
+            seen.add(id(node))
+            stack.extend(node.values() if isinstance(node, dict) else node)
+    return True
+
+
 def as_list(l):
     if isinstance(l, list):
         return l
@@ -346,6 +458,6 @@ def is_local(x):
 
 
 def add_revision_note(raw_cwl, rev_note):
-    out = deepcopy(raw_cwl)
+    out = copy(raw_cwl)
     out['sbg:revisionNotes'] = rev_note
     return out
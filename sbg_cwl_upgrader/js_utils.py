@@ -0,0 +1,285 @@
+from collections import namedtuple, OrderedDict
+import re
+import threading
+
+# Number of tokenized JS snippets kept in memory
+JS_TOKENS_CACHE_SIZE = 4096
+
+Token = namedtuple('Token', ['kind', 'value'])
+
+# Token kinds
+WS = 'ws'
+COMMENT = 'comment'
+STRING = 'string'
+TEMPLATE = 'template'
+REGEX = 'regex'
+NAME = 'name'
+NUMBER = 'number'
+PUNCT = 'punct'
+
+_WS = re.compile(r'\s+')
+_LINE_COMMENT = re.compile(r'//[^\n]*')
+_BLOCK_COMMENT = re.compile(r'/\*.*?(\*/|\Z)', re.S)
+_NAME = re.compile(r'[A-Za-z_$][\w$]*')
+_NUMBER = re.compile(r'(0[xX][0-9a-fA-F]+|(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?)')
+_STRING = {
+    "'": re.compile(r"'([^'\\\n]|\\.)*('|$)", re.S | re.M),
+    '"': re.compile(r'"([^"\\\n]|\\.)*("|$)', re.S | re.M)
+}
+_REGEX = re.compile(r'/(\\.|\[(\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[a-zA-Z]*')
+_PUNCT = re.compile(r'>>>=|===|!==|>>>|<<=|>>=|\*\*=|\.\.\.|=>|==|!=|<=|>=|'
+                    r'&&|\|\||\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|<<|>>|'
+                    r'\*\*|.', re.S)
+
+# Keywords after which "/" starts a regular expression
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of',
+                   'new', 'delete', 'void', 'throw', 'instanceof', 'yield'}
+
+_tokens_cache = OrderedDict()
+# Conversion may run in a pool of threads
+_tokens_cache_lock = threading.Lock()
+
+
+def _regex_allowed(prev):
+    if prev is None:
+        return True
+    if prev.kind == NAME:
+        return prev.value in _REGEX_KEYWORDS
+    if prev.kind == PUNCT:
+        return prev.value not in (')', ']', '}')
+    return prev.kind not in (NUMBER, STRING, TEMPLATE, REGEX)
+
+
+def _tokenize(script: str):
+    tokens = []
+    prev = None  # last significant token
+    # Brace depth of open template literal substitutions
+    templates = []
+    pos = 0
+    while pos < len(script):
+        c = script[pos]
+        if c == '`' or (c == '}' and templates and templates[-1] == 0):
+            # Template literal chunk, up to the end or a substitution
+            if c == '}':
+                templates.pop()
+            end = pos + 1
+            while end < len(script):
+                if script[end] == '\\':
+                    end += 2
+                    continue
+                if script[end] == '`':
+                    end += 1
+                    break
+                if script.startswith('${', end):
+                    end += 2
+                    templates.append(0)
+                    break
+                end += 1
+            token = Token(TEMPLATE, script[pos:end])
+        elif c.isspace():
+            token = Token(WS, _WS.match(script, pos).group())
+        elif script.startswith('//', pos):
+            token = Token(COMMENT, _LINE_COMMENT.match(script, pos).group())
+        elif script.startswith('/*', pos):
+            token = Token(COMMENT, _BLOCK_COMMENT.match(script, pos).group())
+        elif c in _STRING:
+            token = Token(STRING, _STRING[c].match(script, pos).group())
+        elif c == '/' and _regex_allowed(prev) and _REGEX.match(script, pos):
+            token = Token(REGEX, _REGEX.match(script, pos).group())
+        elif _NAME.match(script, pos):
+            token = Token(NAME, _NAME.match(script, pos).group())
+        elif c.isdigit() or (c == '.' and script[pos + 1:pos + 2].isdigit()):
+            token = Token(NUMBER, _NUMBER.match(script, pos).group())
+        else:
+            token = Token(PUNCT, _PUNCT.match(script, pos).group())
+            if templates and token.value == '{':
+                templates[-1] += 1
+            elif templates and token.value == '}':
+                templates[-1] -= 1
+        tokens.append(token)
+        if token.kind not in (WS, COMMENT):
+            prev = token
+        pos += len(token.value)
+    return tuple(tokens)
+
+
+def remember_tokens(script: str, tokens: tuple):
+    """Add tokens of a script to the tokens cache"""
+    with _tokens_cache_lock:
+        _tokens_cache[script] = tokens
+        _tokens_cache.move_to_end(script)
+        if len(_tokens_cache) > JS_TOKENS_CACHE_SIZE:
+            _tokens_cache.popitem(last=False)
+
+
+def tokenize_js(script: str):
+    """
+    Split JS code into tokens. Tokens of every script are cached, so
+    a script is only tokenized once.
+    :param script: JS code
+    :return: tuple of tokens
+    """
+    tokens = _tokens_cache.get(script)
+    if tokens is None:
+        tokens = _tokenize(script)
+    remember_tokens(script, tokens)
+    return tokens
+
+
+def has_return(script: str):
+    """Check if JS code has a return statement"""
+    return any(t.kind == NAME and t.value == 'return'
+               for t in tokenize_js(script))
+
+
+class Draft2JSTranslator(object):
+    """
+    Rewrite draft2 JS objects and properties to v1 ones,
+    in a single pass over script tokens.
+    """
+
+    # Properties of $job and the v1 code replacing them
+    JOB_PROPERTIES = [
+        (('inputs',), 'inputs'),
+        (('allocatedResources', 'mem'), 'runtime.ram'),
+        (('allocatedResources', 'cpu'), 'runtime.cores'),
+        (('allocatedResources',), 'runtime')
+    ]
+
+    def __init__(self, tokens: tuple):
+        self.tokens = tokens
+
+    def _next(self, i: int):
+        """Index of the first significant token at or after i"""
+        while i < len(self.tokens) and self.tokens[i].kind in (WS, COMMENT):
+            i += 1
+        return i
+
+    def _is(self, i: int, kind: str, value: str = None):
+        return (i < len(self.tokens) and self.tokens[i].kind == kind
+                and (value is None or self.tokens[i].value == value))
+
+    def _match_path(self, i: int, path: tuple):
+        """Match ".<name>" for each name in path, return end index"""
+        for name in path:
+            i = self._next(i)
+            if not self._is(i, PUNCT, '.'):
+                return None
+            i = self._next(i + 1)
+            if not self._is(i, NAME, name):
+                return None
+            i += 1
+        return i
+
+    def _match_group(self, i: int):
+        """Match balanced brackets starting at i, return end index"""
+        pairs = {'(': ')', '[': ']'}
+        stack = []
+        while i < len(self.tokens):
+            t = self.tokens[i]
+            if t.kind == PUNCT and t.value in pairs:
+                stack.append(pairs[t.value])
+            elif t.kind == PUNCT and t.value in (')', ']', '{', '}', ';'):
+                if not stack or t.value != stack[-1]:
+                    return None
+                stack.pop()
+            i += 1
+            if not stack:
+                return i
+        return None
+
+    def _match_operand(self, i: int):
+        """Match a variable or a member chain, return end index"""
+        if self._is(i, NAME):
+            i += 1
+        elif self._is(i, PUNCT, '('):
+            i = self._match_group(i)
+            if i is None:
+                return None
+        else:
+            return None
+        while True:
+            j = self._next(i)
+            if self._is(j, PUNCT, '.') and self._is(self._next(j + 1), NAME):
+                i = self._next(j + 1) + 1
+            elif self._is(j, PUNCT, '['):
+                end = self._match_group(j)
+                if end is None:
+                    return None
+                i = end
+            else:
+                return i
+
+    def _match_typeof_undefined(self, i: int):
+        """
+        Match "typeof <operand> !== 'undefined'" starting at i
+        :return: (operand start, operand end, end index) or None
+        """
+        start = self._next(i + 1)
+        end = self._match_operand(start)
+        if end is None:
+            return None
+        j = self._next(end)
+        if not self._is(j, PUNCT, '!=='):
+            return None
+        j = self._next(j + 1)
+        if (self._is(j, STRING)
+                and self.tokens[j].value[1:-1] == 'undefined'):
+            return start, end, j + 1
+        return None
+
+    def translate(self, start: int = 0, end: int = None):
+        """
+        Translate tokens in range
+        :return: list of v1 tokens
+        """
+        end = len(self.tokens) if end is None else end
+        out = []
+        i = start
+        while i < end:
+            t = self.tokens[i]
+            if t.kind == NAME and t.value == '$job':
+                for path, v1_code in self.JOB_PROPERTIES:
+                    path_end = self._match_path(i + 1, path)
+                    if path_end is not None:
+                        out.extend(_tokenize(v1_code))
+                        i = path_end
+                        break
+                else:
+                    out.append(t)
+                    i += 1
+                continue
+            if t.kind == NAME and t.value == '$self':
+                out.append(Token(NAME, 'self'))
+            elif t.kind == NAME and t.value == 'typeof':
+                typeof = self._match_typeof_undefined(i)
+                if typeof:
+                    out.extend(self.translate(typeof[0], typeof[1]))
+                    i = typeof[2]
+                    continue
+                out.append(t)
+            # Sometimes people used ".name" in draft2
+            elif (t.kind == NAME and t.value == 'name' and out
+                    and out[-1] == Token(PUNCT, '.')):
+                out.append(Token(NAME, 'basename'))
+            elif (t.kind == STRING and t.value[1:-1] == 'name' and out
+                    and out[-1] == Token(PUNCT, '[')
+                    and self._is(i + 1, PUNCT, ']')):
+                out.append(Token(STRING, t.value[0] + 'basename' +
+                                 t.value[-1]))
+            else:
+                out.append(t)
+            i += 1
+        return out
+
+
+def translate_draft2_js(script: str):
+    """
+    Translate draft2 JS code to v1 JS code
+    :param script: draft2 JS code
+    :return: v1 JS code
+    """
+    tokens = tuple(Draft2JSTranslator(tokenize_js(script)).translate())
+    v1_script = ''.join(t.value for t in tokens)
+    remember_tokens(v1_script, tokens)
+    return v1_script
@@ -1,13 +1,16 @@
 from datetime import datetime
 from setuptools import setup, find_packages
 import os
+import re
 
 
 NAME = 'sbg_cwl_upgrader'
-VERSION = '0.4.0'
 DIR = os.path.abspath(os.path.dirname(__file__))
 NOW = datetime.utcnow()
 
+with open(os.path.join(DIR, NAME, '__init__.py')) as f:
+    VERSION = re.search(r"__version__ = '(.*)'", f.read()).group(1)
+
 with open(os.path.join(DIR, 'README.md')) as f:
     long_description = f.read()
 
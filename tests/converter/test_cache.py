@@ -0,0 +1,110 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from sbg_cwl_upgrader.converter.cache import (ConversionMemo,
+                                              ConversionDiskCache)
+
+
+class TestConversionMemo(TestCase):
+    def setUp(self):
+        self.memo = ConversionMemo()
+        self.tool = {
+            "class": "CommandLineTool",
+            "cwlVersion": "sbg:draft-2",
+            "inputs": []
+        }
+
+    def test_convert_once(self):
+        """
+        Test that same app is converted only once and counters are updated
+        """
+        convert = MagicMock(return_value={"class": "CommandLineTool"})
+        first = self.memo.convert(self.tool, convert)
+        second = self.memo.convert(dict(self.tool), convert)
+        convert.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertEqual(self.memo.hits, 1)
+        self.assertEqual(self.memo.misses, 1)
+
+    def test_hit_returns_copy(self):
+        """
+        Test that memo hits don't share objects with previous results
+        """
+        convert = MagicMock(return_value={"inputs": {"a": {}}})
+        first = self.memo.convert(self.tool, convert)
+        first["inputs"]["a"]["type"] = "File"
+        second = self.memo.convert(self.tool, convert)
+        self.assertNotIn("type", second["inputs"]["a"])
+        self.assertIsNot(first, second)
+
+    def test_pickle_drops_content(self):
+        """
+        Test that memo content is not shipped to worker processes
+        """
+        self.memo.convert(self.tool, MagicMock(return_value={}))
+        worker_memo = pickle.loads(pickle.dumps(self.memo))
+        self.assertNotIn(self.memo.key(self.tool), worker_memo)
+        self.assertEqual(worker_memo.misses, 0)
+
+    def test_prefetched_not_counted(self):
+        """
+        Test that lookups of apps converted ahead of time are not counted
+        """
+        convert = MagicMock()
+        self.memo.store(self.memo.key(self.tool), {"class": "Workflow"},
+                        prefetched=True)
+        self.assertEqual(self.memo.convert(self.tool, convert),
+                         {"class": "Workflow"})
+        convert.assert_not_called()
+        self.assertEqual(self.memo.hits, 0)
+        self.assertEqual(self.memo.misses, 0)
+
+
+class TestConversionDiskCache(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ConversionDiskCache(self.cache_dir)
+        self.tool = {
+            "class": "CommandLineTool",
+            "cwlVersion": "sbg:draft-2",
+            "inputs": []
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_convert_reused_between_instances(self):
+        """
+        Test that a converted app is reused by a new cache instance
+        """
+        convert = MagicMock(return_value={"cwlVersion": "v1.0"})
+        self.cache.convert(self.tool, 'v1.0', convert)
+        converted = ConversionDiskCache(self.cache_dir).convert(
+            self.tool, 'v1.0', convert
+        )
+        convert.assert_called_once()
+        self.assertEqual(converted, {"cwlVersion": "v1.0"})
+
+    def test_key_depends_on_cwl_version(self):
+        self.assertNotEqual(self.cache.key(self.tool, 'v1.0'),
+                            self.cache.key(self.tool, 'v1.1'))
+
+    def test_lru_eviction(self):
+        """
+        Test that least recently used entries are evicted over size limit
+        """
+        self.cache.put('a', {"foo": "a" * 100})
+        self.cache.put('b', {"foo": "b" * 100})
+        # Mark "a" as used after "b"
+        past = time.time() - 100
+        os.utime(os.path.join(self.cache_dir, 'b.json'), (past, past))
+        self.cache.get('a')
+        self.cache.max_size = 150
+        self.cache.put('c', {"foo": "c"})
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
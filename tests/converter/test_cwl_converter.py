@@ -1,4 +1,5 @@
 from sbg_cwl_upgrader.converter.cwl_converter import CWLConverterFacade
+from sbg_cwl_upgrader.converter.cache import ConversionMemo
 import json
 import sevenbridges
 from sevenbridges import NotFound
@@ -32,11 +33,16 @@ class TestCWLConverter(TestCase):
             result = json.load(f)
         c = object.__new__(CWLConverterFacade)
         c.cwl_version = 'v1.0'
+        c.memo = ConversionMemo()
+        c.cache = None
         converted = c._parse(in_data)
         for cwl_key in ['hints', 'steps', 'inputs', 'outputs', 'requirements']:
             self.assertEqual(len(converted[cwl_key]),
                              len(result[cwl_key]),
                              "Number of items in {} not good".format(cwl_key))
+        # Every step runs a different tool
+        self.assertEqual(c.memo.misses, len(in_data['steps']))
+        self.assertEqual(c.memo.hits, 0)
 
     @patch('sys.stdout', MagicMock())
     @patch('sys.stderr', MagicMock())
@@ -0,0 +1,79 @@
+from unittest import TestCase
+from unittest.mock import patch
+from multiprocessing.pool import ThreadPool
+from sbg_cwl_upgrader.converter import executor
+
+
+def square(x):
+    return x * x
+
+
+class TestExecutor(TestCase):
+    def tearDown(self):
+        executor.shutdown_pool()
+        executor.set_jobs(None)
+        executor.set_backend('auto')
+
+    def test_pool_reused(self):
+        executor.set_jobs(2)
+        pool = executor.get_pool()
+        self.assertIs(executor.get_pool(), pool)
+        self.assertEqual(sorted(executor.imap_unordered(square, [1, 2, 3])),
+                         [1, 4, 9])
+
+    def test_shutdown_pool(self):
+        executor.set_jobs(2)
+        pool = executor.get_pool()
+        executor.shutdown_pool()
+        self.assertIsNot(executor.get_pool(), pool)
+
+    def test_set_jobs_resizes_pool(self):
+        executor.set_jobs(2)
+        pool = executor.get_pool()
+        executor.set_jobs(3)
+        self.assertIsNot(executor.get_pool(), pool)
+
+    def test_single_job_serial(self):
+        executor.set_jobs(1)
+        self.assertIsNone(executor.get_pool())
+        self.assertEqual(list(executor.imap_unordered(square, [1, 2])),
+                         [1, 4])
+
+    def test_serial_in_worker(self):
+        executor.set_jobs(2)
+        with patch.object(executor, '_in_worker', return_value=True):
+            self.assertIsNone(executor.get_pool())
+
+    def test_invalid_jobs(self):
+        with self.assertRaises(ValueError):
+            executor.set_jobs(0)
+
+    def test_serial_backend(self):
+        executor.set_jobs(2)
+        executor.set_backend('serial')
+        self.assertIsNone(executor.get_pool())
+
+    def test_thread_backend(self):
+        executor.set_jobs(2)
+        executor.set_backend('thread')
+        self.assertIsInstance(executor.get_pool(), ThreadPool)
+        self.assertFalse(executor.isolated())
+        self.assertEqual(sorted(executor.imap_unordered(square, [1, 2, 3])),
+                         [1, 4, 9])
+
+    def test_auto_backend(self):
+        executor.set_backend('auto')
+        self.assertEqual(executor.select_backend(10), 'serial')
+        self.assertEqual(
+            executor.select_backend(executor.AUTO_PROCESS_COST + 1),
+            'process'
+        )
+        self.assertTrue(executor.isolated())
+
+    def test_explicit_backend_kept(self):
+        executor.set_backend('thread')
+        self.assertEqual(executor.select_backend(10), 'thread')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            executor.set_backend('gpu')
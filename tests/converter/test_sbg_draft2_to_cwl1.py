@@ -23,7 +23,12 @@ class TestArgParser(TestCase):
             profile='default',
             token=None,
             update=False,
-            validate=False
+            validate=False,
+            cache_dir=None,
+            cache_size=512,
+            beautify=True,
+            jobs=None,
+            executor='auto'
         )
 
     @patch('logging.basicConfig', MagicMock())
@@ -44,5 +49,48 @@ class TestArgParser(TestCase):
             profile='default',
             token=None,
             update=True,
-            validate=True
+            validate=True,
+            cache_dir=None,
+            cache_size=512,
+            beautify=True,
+            jobs=None,
+            executor='auto'
         )
+
+    @patch('logging.basicConfig', MagicMock())
+    @patch(
+        'sbg_cwl_upgrader.converter.sbg_draft2_to_cwl_1_0.CWLConverterFacade'
+    )
+    def test_cache_inputs(self, mock_facade):
+        main(['-i', 'a.cwl', '-o', 'b.cwl', '--cache',
+              '--cache-dir', 'foo', '--cache-size', '10'])
+        _, kwargs = mock_facade.call_args
+        self.assertEqual(kwargs['cache_dir'], 'foo')
+        self.assertEqual(kwargs['cache_size'], 10)
+
+    @patch('logging.basicConfig', MagicMock())
+    @patch(
+        'sbg_cwl_upgrader.converter.sbg_draft2_to_cwl_1_0.CWLConverterFacade'
+    )
+    def test_no_beautify(self, mock_facade):
+        main(['-i', 'a.cwl', '-o', 'b.cwl', '--no-beautify'])
+        _, kwargs = mock_facade.call_args
+        self.assertFalse(kwargs['beautify'])
+
+    @patch('logging.basicConfig', MagicMock())
+    @patch(
+        'sbg_cwl_upgrader.converter.sbg_draft2_to_cwl_1_0.CWLConverterFacade'
+    )
+    def test_jobs(self, mock_facade):
+        main(['-i', 'a.cwl', '-o', 'b.cwl', '-j', '4'])
+        _, kwargs = mock_facade.call_args
+        self.assertEqual(kwargs['jobs'], 4)
+
+    @patch('logging.basicConfig', MagicMock())
+    @patch(
+        'sbg_cwl_upgrader.converter.sbg_draft2_to_cwl_1_0.CWLConverterFacade'
+    )
+    def test_executor(self, mock_facade):
+        main(['-i', 'a.cwl', '-o', 'b.cwl', '--executor', 'thread'])
+        _, kwargs = mock_facade.call_args
+        self.assertEqual(kwargs['executor'], 'thread')
@@ -0,0 +1,101 @@
+from unittest import TestCase
+from unittest.mock import patch
+from copy import deepcopy
+import json
+import os
+from sbg_cwl_upgrader.converter import executor
+from sbg_cwl_upgrader.converter.cache import ConversionMemo
+from sbg_cwl_upgrader.converter.workflow import CWLWorkflowConverter
+from sbg_cwl_upgrader.converter.scheduler import conversion_cost
+
+
+def wrap(app: dict):
+    """Wrap draft2 app in a single step draft2 workflow"""
+    return {
+        "class": "Workflow",
+        "cwlVersion": "sbg:draft-2",
+        "inputs": app["inputs"],
+        "outputs": [{"id": o["id"], "type": o["type"],
+                     "source": ["#inner." + o["id"].lstrip("#")]}
+                    for o in app["outputs"]],
+        "steps": [{
+            "id": "#inner",
+            "run": app,
+            "inputs": [{"id": "#inner." + i["id"].lstrip("#"),
+                        "source": [i["id"]]} for i in app["inputs"]],
+            "outputs": [{"id": "#inner." + o["id"].lstrip("#")}
+                        for o in app["outputs"]]
+        }]
+    }
+
+
+class TestConversionScheduler(TestCase):
+    def setUp(self):
+        with open(os.path.join(os.path.dirname(__file__),
+                               'wes_draft2.json')) as f:
+            self.wf = json.load(f)
+        # Nest every other tool two subworkflows deep, inputs of
+        # wrappers are shared with wrapped apps
+        for step in self.wf["steps"][:8:2]:
+            step["run"] = wrap(wrap(step["run"]))
+
+    def tearDown(self):
+        executor.shutdown_pool()
+        executor.set_jobs(None)
+        executor.set_backend('auto')
+
+    def convert(self, jobs: int, backend: str = 'process'):
+        executor.set_jobs(jobs)
+        executor.set_backend(backend)
+        memo = ConversionMemo()
+        converted = CWLWorkflowConverter(memo=memo).convert_dict(
+            deepcopy(self.wf)
+        )
+        return converted, memo
+
+    def test_same_as_serial(self):
+        """
+        Test that bottom-up conversion in a pool gives the same workflow
+        and memo counters as converting it step by step
+        """
+        serial, serial_memo = self.convert(1)
+        scheduled, scheduled_memo = self.convert(2)
+        self.assertEqual(scheduled, serial)
+        self.assertEqual(scheduled_memo.summary(), serial_memo.summary())
+        self.assertEqual(scheduled_memo.misses, 36)
+
+    def test_thread_backend_same_as_serial(self):
+        """
+        Test that converting in threads, on the shared document,
+        gives the same workflow as converting it step by step
+        """
+        serial, serial_memo = self.convert(1)
+        threaded, threaded_memo = self.convert(2, 'thread')
+        self.assertEqual(threaded, serial)
+        self.assertEqual(threaded_memo.summary(), serial_memo.summary())
+
+
+class TestConversionCost(TestCase):
+    def test_cost(self):
+        tool = {
+            "class": "CommandLineTool",
+            "inputs": [{"id": "#a"}, {"id": "#b", "inputBinding": {
+                "valueFrom": {"class": "Expression", "script": "1"}
+            }}],
+            "outputs": [{"id": "#c", "type": ["File"]}]
+        }
+        self.assertEqual(conversion_cost(tool), 4)
+        # Nested apps are included
+        self.assertEqual(conversion_cost(wrap(tool)), 8)
+
+    @patch('sbg_cwl_upgrader.converter.workflow.imap_unordered')
+    def test_steps_longest_first(self, mock_imap):
+        small = {"class": "CommandLineTool", "inputs": [], "outputs": []}
+        large = {"class": "CommandLineTool", "inputs": [{"id": "#a"}],
+                 "outputs": []}
+        mock_imap.return_value = []
+        converter = CWLWorkflowConverter()
+        converter.handle_steps([{"id": "#s1", "run": small},
+                                {"id": "#s2", "run": large}])
+        tasks = mock_imap.call_args[0][1]
+        self.assertEqual([t["id"] for t in tasks], ["#s2", "#s1"])
@@ -1,5 +1,6 @@
 from unittest import TestCase
 from unittest.mock import patch
+from copy import deepcopy
 import io
 import sbg_cwl_upgrader
 from sbg_cwl_upgrader.converter.cwl_converter import CWLConverterFacade
@@ -7,6 +8,7 @@ from sbg_cwl_upgrader.converter.tool import (Input, Output, Expression,
                                              CommandLineBinding,
                                              CWLToolConverter,
                                              OutputBinding, InputRecordField)
+from sbg_cwl_upgrader.cwl_utils import beautify_expressions
 import random
 import subprocess
 import string
@@ -713,8 +715,8 @@ class TestCWLToolConverter(TestCase):
                     'entry': '$("$")(baz)'
                 },
                 {
-                    'entryname': "${\n    return 'foo/bar'\n}",
-                    'entry': "${\n    {\n        return '$(baz)')\n}"
+                    'entryname': "${ return 'foo/bar' }",
+                    'entry': "${{ return '$(baz)')}"
                 }
             ]
         }
@@ -723,8 +725,48 @@ class TestCWLToolConverter(TestCase):
                    if req["class"] == "InitialWorkDirRequirement"][0]
 
         self.assertDictEqual(expected, iwd_req)
+        # Expressions are formatted in a final pass over the document
+        beautify_expressions(iwd_req)
+        self.assertEqual(iwd_req['listing'][1]['entryname'],
+                         "${\n    return 'foo/bar'\n}")
+        self.assertEqual(iwd_req['listing'][1]['entry'],
+                         "${\n    {\n        return '$(baz)')\n}")
         self.assertIn("Please modify name", mock_stdout.getvalue())
 
+    def test_convert_dict_owned(self):
+        """
+        Test input is copied unless converter owns it,
+        and both modes give the same result.
+        :return:
+        """
+        draft2 = {
+            "class": "CommandLineTool",
+            "cwlVersion": "sbg:draft-2",
+            "baseCommand": ["echo"],
+            "inputs": [{
+                "id": "#in1",
+                "type": ["null", "File"],
+                "sbg:stageInput": "link",
+                "inputBinding": {
+                    "position": 1,
+                    "valueFrom": {
+                        "class": "Expression",
+                        "script": "$job.inputs.in1.path"
+                    }
+                }
+            }],
+            "outputs": [{
+                "id": "#out1",
+                "type": ["File"],
+                "outputBinding": {"glob": "*.txt"}
+            }]
+        }
+        original = deepcopy(draft2)
+        cwl1 = CWLToolConverter().convert_dict(draft2)
+        self.assertEqual(draft2, original)
+        cwl1_owned = CWLToolConverter(owned=True).convert_dict(draft2)
+        self.assertEqual(cwl1, cwl1_owned)
+
     def test_handle_base_command(self):
         """
         Test only non expressions from base command are added to cwl1.
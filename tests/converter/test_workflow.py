@@ -1,5 +1,5 @@
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from sbg_cwl_upgrader.converter.workflow import CWLWorkflowConverter
 from sbg_cwl_upgrader.converter.workflow import CWLToolConverter
 
@@ -34,6 +34,18 @@ class TestCWLWorkflowConverter(TestCase):
         self.assertNotIn("description", v1_input)
         self.assertEqual(v1_input["doc"], d2_input["description"])
 
+    def test_handle_input_owned(self):
+        d2_input = {
+            "id": "#foo",
+            "source": ["#bar.baz"]
+        }
+        v1_input = self.converter.handle_input(d2_input)
+        self.assertIsNot(v1_input, d2_input)
+        self.assertEqual(d2_input["id"], "#foo")
+        owner = CWLWorkflowConverter(owned=True)
+        self.assertIs(owner.handle_input(d2_input), d2_input)
+        self.assertEqual(d2_input, v1_input)
+
     def test_handle_output(self):
         d2_output = {
             "id": "#foo",
@@ -107,6 +119,22 @@ class TestCWLWorkflowConverter(TestCase):
         self.converter.parse_step(d2_step_wf, "foo")
         CWLToolConverter.convert_dict.assert_called()
 
+    def test_parse_step_memo(self):
+        """
+        Test that the same app is converted only once per run
+        """
+        d2_tool = {
+            "class": "CommandLineTool",
+            "cwlVersion": "sbg:draft-2"
+        }
+        with patch.object(CWLToolConverter, 'convert_dict',
+                          MagicMock(return_value={})) as mock_convert:
+            self.converter.parse_step(d2_tool, "foo")
+            self.converter.parse_step(dict(d2_tool), "bar")
+        mock_convert.assert_called_once()
+        self.assertEqual(self.converter.memo.hits, 1)
+        self.assertEqual(self.converter.memo.misses, 1)
+
     def test_parse_step_unknown(self):
         d2_step_wf = {
             "class": "FooBar"
@@ -1,8 +1,15 @@
 from unittest import TestCase
+from unittest.mock import patch
 from sbg_cwl_upgrader.cwl_utils import (cwl_ensure_dict,
                                         cwl_ensure_array,
-                                        get_abs_path)
+                                        get_abs_path,
+                                        CWL,
+                                        js_cache_info,
+                                        beautify_expressions,
+                                        copy_tree,
+                                        is_tree)
 import unittest
+import io
 import sys
 
 
@@ -94,3 +101,87 @@ class TestGetAbsPath(TestCase):
         base = "/a"
         self.assertEqual(get_abs_path(input_, base),
                          "/c")
+
+
+class TestJSCache(TestCase):
+    def test_parse_js_memo(self):
+        """
+        Test that repeated scripts are served from the memo
+        """
+        script = "{ return $job.inputs.memo_test.path }"
+        before = js_cache_info()['parse_js']
+        first = CWL().parse_js(script)
+        second = CWL().parse_js(script)
+        after = js_cache_info()['parse_js']
+        self.assertEqual(first, second)
+        self.assertEqual(after.misses - before.misses, 1)
+        self.assertEqual(after.hits - before.hits, 1)
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    def test_warnings_on_memo_hit(self, mock_stdout):
+        """
+        Test that warnings are printed for memoized scripts as well
+        """
+        script = "{ var memo_test = 1 }"
+        CWL().parse_js(script)
+        CWL().parse_js(script)
+        self.assertEqual(mock_stdout.getvalue().count("No return"), 2)
+
+    def test_beautify_memo(self):
+        """
+        Test that every unique expression is formatted once
+        """
+        doc = {
+            "arguments": [{"valueFrom": "${ return 'memo_test' }"}],
+            "outputs": {
+                "foo": {"outputBinding": {"glob": "${ return 'memo_test' }"}}
+            }
+        }
+        before = js_cache_info()['beautify_js']
+        beautify_expressions(doc)
+        after = js_cache_info()['beautify_js']
+        self.assertEqual(after.misses - before.misses, 1)
+        self.assertEqual(after.hits - before.hits, 1)
+        self.assertEqual(doc["arguments"][0]["valueFrom"],
+                         "${\n    return 'memo_test'\n}")
+
+
+class TestBeautifyExpressions(TestCase):
+    def test_only_expressions_formatted(self):
+        doc = {
+            "doc": "Some {text}",
+            "valueFrom": "$(self ? [].concat(self) : self)",
+            "entry": "${return 1}"
+        }
+        beautify_expressions(doc)
+        self.assertEqual(doc["doc"], "Some {text}")
+        self.assertEqual(doc["valueFrom"],
+                         "$(self ? [].concat(self) : self)")
+        self.assertEqual(doc["entry"], "${\n    return 1\n}")
+
+    def test_typeof_undefined_unformatted(self):
+        """
+        Test that undefined checks are translated before formatting
+        """
+        script = ('{ if (typeof $job.inputs.a !== "undefined" && '
+                  "typeof $job.inputs.b[0] !== 'undefined') { return 1 } }")
+        v1 = CWL().parse_js(script)
+        self.assertIn("if (inputs.a && inputs.b[0])", v1)
+        self.assertNotIn("typeof", v1)
+
+
+class TestCopyTree(TestCase):
+    def test_shared_objects_copied(self):
+        shared = {"type": ["null", "File"]}
+        data = {"inputs": [shared, shared]}
+        copied = copy_tree(data)
+        self.assertEqual(copied, data)
+        self.assertIsNot(copied["inputs"][0], shared)
+        self.assertIsNot(copied["inputs"][0], copied["inputs"][1])
+        self.assertIsNot(copied["inputs"][0]["type"],
+                         copied["inputs"][1]["type"])
+
+    def test_is_tree(self):
+        shared = {"type": ["null", "File"]}
+        self.assertTrue(is_tree({"inputs": [shared, {"type": "File"}]}))
+        self.assertFalse(is_tree({"inputs": [shared, shared]}))
@@ -0,0 +1,68 @@
+from unittest import TestCase
+from sbg_cwl_upgrader.js_utils import (tokenize_js, translate_draft2_js,
+                                       has_return, Token, STRING, REGEX,
+                                       COMMENT, TEMPLATE)
+
+
+class TestTokenizeJS(TestCase):
+    def test_tokens_join_to_script(self):
+        script = ("${ var a = 'it''s' + \"b\" // c\n"
+                  "/* d */ return a.replace(/'/g, '') / 2 + `e${a}f` }")
+        self.assertEqual(''.join(t.value for t in tokenize_js(script)),
+                         script)
+
+    def test_token_kinds(self):
+        tokens = tokenize_js("x = /a'b/g; // c\n y = 'd' + `e`")
+        self.assertIn(Token(REGEX, "/a'b/g"), tokens)
+        self.assertIn(Token(COMMENT, "// c"), tokens)
+        self.assertIn(Token(STRING, "'d'"), tokens)
+        self.assertIn(Token(TEMPLATE, "`e`"), tokens)
+
+    def test_division_not_regex(self):
+        tokens = tokenize_js("a = b / c / d")
+        self.assertNotIn(REGEX, [t.kind for t in tokens])
+
+    def test_cached(self):
+        script = "{ return 'cache_test' }"
+        self.assertIs(tokenize_js(script), tokenize_js(script))
+
+
+class TestTranslateDraft2JS(TestCase):
+    def test_job_properties(self):
+        self.assertEqual(
+            translate_draft2_js("$job.inputs.a + $job.allocatedResources.mem"
+                                " + $job.allocatedResources.cpu + "
+                                "$job.allocatedResources + $self"),
+            "inputs.a + runtime.ram + runtime.cores + runtime + self"
+        )
+
+    def test_name_to_basename(self):
+        self.assertEqual(
+            translate_draft2_js("$self.name + $self['name'] + $self.names"),
+            "self.basename + self['basename'] + self.names"
+        )
+
+    def test_strings_and_comments_kept(self):
+        script = "'$job.inputs.a.name' // $job.inputs.b"
+        self.assertEqual(translate_draft2_js(script), script)
+
+    def test_template_substitution(self):
+        self.assertEqual(translate_draft2_js("`${$job.inputs.a}.txt`"),
+                         "`${inputs.a}.txt`")
+
+    def test_typeof_undefined(self):
+        self.assertEqual(
+            translate_draft2_js(
+                'if (typeof $job.inputs.a[0].b !== "undefined" && '
+                "typeof (x) !== 'undefined' && typeof y === 'undefined')"
+            ),
+            "if (inputs.a[0].b && (x) && typeof y === 'undefined')"
+        )
+
+
+class TestHasReturn(TestCase):
+    def test_return_keyword(self):
+        self.assertTrue(has_return("{ return 1 }"))
+
+    def test_return_in_string_or_comment(self):
+        self.assertFalse(has_return("{ x = 'return' // return\n }"))